@@ -0,0 +1,48 @@
+"""
+measure time cost of `import pyminitouch`, in fresh interpreters.
+
+usage::
+
+    python benchmark/import_time.py
+"""
+import os
+import sys
+import subprocess
+
+# seconds
+IMPORT_TIME_BUDGET = 0.05
+ROUNDS = 10
+# should not be imported by core protocol
+LAZY_MODULES = ("requests", "loguru", "pyminitouch.installer")
+
+_SCRIPT = """
+import sys, time
+start = time.perf_counter()
+import pyminitouch
+cost = time.perf_counter() - start
+print(cost, *[each for each in sys.argv[1:] if each in sys.modules])
+"""
+
+
+def measure():
+    cost_list = []
+    for _ in range(ROUNDS):
+        output = subprocess.check_output(
+            [sys.executable, "-c", _SCRIPT, *LAZY_MODULES],
+            cwd=os.path.dirname(os.path.dirname(os.path.abspath(__file__))),
+        )
+        cost, *loaded = output.decode().split()
+        assert not loaded, "should be imported lazily: {}".format(loaded)
+        cost_list.append(float(cost))
+    return cost_list
+
+
+if __name__ == "__main__":
+    result = sorted(measure())
+    median = result[len(result) // 2]
+    print(
+        "import pyminitouch: min {:.4f}s, median {:.4f}s, budget {:.4f}s".format(
+            result[0], median, IMPORT_TIME_BUDGET
+        )
+    )
+    assert median <= IMPORT_TIME_BUDGET, "import time out of budget"
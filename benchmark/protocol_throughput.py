@@ -0,0 +1,50 @@
+"""
+measure throughput of protocol layer (CommandBuilder + MNTConnection),
+with in-memory transport. no device or I/O needed.
+
+usage::
+
+    python benchmark/protocol_throughput.py
+"""
+import time
+
+from pyminitouch import CommandBuilder
+from pyminitouch.connection import MNTConnection
+from pyminitouch.transport import LoopbackTransport
+
+ROUNDS = 100000
+
+
+def build_payload(builder, index):
+    x, y = index % 1000, index % 2000
+    builder.down(0, x, y, 50)
+    builder.commit()
+    builder.move(0, x + 10, y + 10, 50)
+    builder.commit()
+    builder.up(0)
+    builder.commit()
+
+
+def measure():
+    transport = LoopbackTransport()
+    connection = MNTConnection(transport=transport)
+    builder = CommandBuilder()
+
+    start_time = time.perf_counter()
+    for index in range(ROUNDS):
+        build_payload(builder, index)
+        connection.send(builder._content, builder._delay)
+        builder.reset()
+    cost = time.perf_counter() - start_time
+
+    connection.disconnect()
+    return cost, transport.sent_bytes
+
+
+if __name__ == "__main__":
+    cost, sent_bytes = measure()
+    print(
+        "{} payloads in {:.3f}s: {:.0f} payloads/s, {:.2f} MB/s".format(
+            ROUNDS, cost, ROUNDS / cost, sent_bytes / cost / 1024 / 1024
+        )
+    )
@@ -49,7 +49,8 @@ device.ext_smooth_swipe(
 )
 
 # stop minitouch
-# when it was stopped, minitouch can do nothing for device, including release.
+# held contacts will be released before it stopped.
+# after that, minitouch can do nothing for device.
 device.stop()
 
 # ---
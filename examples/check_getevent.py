@@ -0,0 +1,57 @@
+"""
+check GeteventParser with the sample, no device needed.
+
+usage::
+
+    python examples/check_getevent.py
+"""
+import os
+
+from pyminitouch.capture import GeteventParser
+
+# synthetic, in the format of `adb shell getevent -lt` (8ms between frames).
+# its blocks, in order:
+# - tap
+# - tap again at the same spot, without position events
+# - swipe
+# - key events from another input device, should be ignored
+# - pinch, two slots
+# - release and touch again in the same frame
+_SAMPLE = os.path.join(
+    os.path.dirname(os.path.abspath(__file__)), "getevent_sample.txt"
+)
+
+EXPECTED = [
+    # tap
+    "d 0 540 1200 40\nc\nw 62\nu 0\nc\n",
+    # tap again at the same spot, without position events
+    "d 0 540 1200 40\nc\nw 50\nu 0\nc\n",
+    # swipe
+    "d 0 200 1800 45\nc\n"
+    + "".join("w 8\nm 0 200 {} 45\nc\n".format(1800 - i * 100) for i in range(1, 9))
+    + "w 8\nu 0\nc\n",
+    # pinch, slot 0 keeps the pressure of its last contact
+    "d 0 300 1000 45\nd 1 700 1400 50\nc\n"
+    + "".join(
+        "w 8\nm 0 {0} {1} 45\nm 1 {2} {3} 50\nc\n".format(
+            300 + i * 20, 1000 + i * 20, 700 - i * 20, 1400 - i * 20
+        )
+        for i in range(1, 6)
+    )
+    + "w 8\nu 0\nc\nw 8\nu 1\nc\n",
+    # release and touch again in one frame
+    "d 0 100 100 45\nc\nw 20\nu 0\nc\nd 0 900 100 45\nc\nw 20\nu 0\nc\n",
+]
+
+
+if __name__ == "__main__":
+    parser = GeteventParser(1079, 2339, 1079, 2339, input_device="/dev/input/event2")
+    with open(_SAMPLE) as f:
+        result = [builder._content for builder in parser.feed_lines(f)]
+
+    assert len(result) == len(EXPECTED), "{} gestures found".format(len(result))
+    for index, (actual, expected) in enumerate(zip(result, EXPECTED)):
+        assert actual == expected, "gesture {}: {!r} != {!r}".format(
+            index, actual, expected
+        )
+    print("{} gestures matched".format(len(result)))
@@ -0,0 +1,25 @@
+import os
+
+from pyminitouch import safe_connection
+from pyminitouch.capture import GeteventParser
+
+_DEVICE_ID = "123456F"
+# synthetic, in the format of `adb shell getevent -lt`.
+# see check_getevent.py for its blocks, or record your own one
+_SAMPLE = os.path.join(os.path.dirname(__file__), "getevent_sample.txt")
+# ranges of touch screen, from `adb shell getevent -lp`
+_INPUT_MAX_X = 1079
+_INPUT_MAX_Y = 2339
+
+
+with safe_connection(_DEVICE_ID) as connection:
+    parser = GeteventParser(
+        connection.max_x,
+        connection.max_y,
+        _INPUT_MAX_X,
+        _INPUT_MAX_Y,
+        input_device="/dev/input/event2",
+    )
+    with open(_SAMPLE) as f:
+        for builder in parser.feed_lines(f):
+            builder.publish(connection)
@@ -1,2 +1,4 @@
 from pyminitouch.connection import safe_connection
-from pyminitouch.actions import safe_device, MNTDevice, CommandBuilder
+from pyminitouch.actions import safe_device, shutdown_devices, MNTDevice, CommandBuilder
+from pyminitouch.pipeline import MNTWriter
+from pyminitouch.gesture import Gesture
@@ -0,0 +1,5 @@
+import sys
+
+from pyminitouch.cli import main
+
+sys.exit(main())
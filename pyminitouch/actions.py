@@ -1,8 +1,14 @@
 import time
+import threading
 from contextlib import contextmanager
+from concurrent.futures import Future, wait
 
 from pyminitouch.logger import logger
 from pyminitouch.connection import MNTConnection, MNTServer, safe_connection
+from pyminitouch.pipeline import MNTWriter
+from pyminitouch.transport import LoopbackTransport, build_transport
+from pyminitouch.gesture import Gesture
+from pyminitouch.scheduler import PRIORITY_INTERACTIVE, PRIORITY_NORMAL
 from pyminitouch import config
 from pyminitouch.utils import restart_adb
 
@@ -61,10 +67,17 @@ class CommandBuilder(object):
         self.commit()
         final_content = self._content
         logger.info("send operation: {}".format(final_content.replace("\n", "\\n")))
-        connection.send(final_content)
-        time.sleep(self._delay / 1000 + config.DEFAULT_DELAY)
+        connection.send(final_content, self._delay)
+        connection.wait_until_done()
         self.reset()
 
+    def submit(self, writer):
+        """ enqueue current commands (_content) to writer, and return a future """
+        self.commit()
+        future = writer.submit(self._content, self._delay)
+        self.reset()
+        return future
+
     def reset(self):
         """ clear current commands (_content) """
         self._content = ""
@@ -91,11 +104,9 @@ class MNTDevice(object):
         device.tap([(400, 600)], pressure=50)
 
         # long-time-tap
-        # for long-click, you should control time delay by yourself
-        # because minitouch return nothing when actions done
-        # we will never know the time when it finished
+        # it returns after the action finished on device
+        # finish time is estimated from durations and connection latency
         device.tap([(400, 600)], duration=1000)
-        time.sleep(1)
 
         # swipe
         device.swipe([(100, 100), (500, 500)])
@@ -106,29 +117,153 @@ class MNTDevice(object):
         device.ext_smooth_swipe([(100, 100), (400, 400), (200, 400)], duration=500, pressure=50, part=20)
 
         # stop minitouch
-        # when it was stopped, minitouch can do nothing for device, including release.
+        # held contacts will be released before it stopped.
+        # after that, minitouch can do nothing for device.
         device.stop()
+
+    With `pipeline=True`, actions will be sent by a background writer thread.
+    They return immediately with a future, so you can prepare the next one::
+
+        device = MNTDevice(_DEVICE_ID, pipeline=True)
+        device.tap([(400, 600)], duration=1000)
+        future = device.swipe([(100, 100), (500, 500)], duration=500)
+
+        # wait for all actions above
+        future.result()
+        device.stop()
+
+    By default, it connects to minitouch via a port forwarded by adb.
+    For emulators or containers on the same host, connect to its unix socket directly::
+
+        device = MNTDevice(_DEVICE_ID, address='unix:@minitouch')
     """
 
-    def __init__(self, device_id):
+    def __init__(self, device_id, pipeline=None, address=None):
         self.device_id = device_id
+        self.pipeline = pipeline
+        # see `pyminitouch.transport.build_transport`
+        # None means tcp, with adb forward
+        self.address = address
         self.server = None
         self.connection = None
+        self.writer = None
+
+        # updated by health monitor
+        self.healthy = True
+        self.unhealthy_reason = None
+
         self.start()
 
     def reset(self):
         self.stop()
-        self.start()
-
-    def start(self):
+        # reconnect is urgent, its adb commands run before others
+        self.start(PRIORITY_INTERACTIVE)
+
+    def start(self, priority=PRIORITY_NORMAL):
+        if self.address:
+            transport = build_transport(self.address)
+        else:
+            transport = None
         # prepare for connection
-        self.server = MNTServer(self.device_id)
+        # loopback has nothing on device, no adb at all
+        if isinstance(transport, LoopbackTransport):
+            self.server = None
+            port = None
+        else:
+            self.server = MNTServer(
+                self.device_id, forward=not self.address, priority=priority
+            )
+            port = self.server.port
         # real connection
-        self.connection = MNTConnection(self.server.port)
+        self.connection = MNTConnection(port, transport)
+        if self.pipeline:
+            self.writer = MNTWriter(self.connection)
+        self.healthy = True
+        self.unhealthy_reason = None
+
+    def stop(self, timeout=None, cancel=False):
+        """
+        stop minitouch, and clean up.
+        held contacts will be released, and minitouch on device will be killed.
+        queued actions (pipeline) will be sent before it, and cancelled if beyond timeout.
+        do nothing if already stopped.
 
-    def stop(self):
+        :param timeout: max seconds to wait for queued and running actions, None means no limit
+        :param cancel: cancel queued actions rather than sending them
+        """
+        if self.is_stopped():
+            return
+        start_time = time.monotonic()
+
+        def remaining():
+            if timeout is None:
+                return None
+            return max(timeout - (time.monotonic() - start_time), 0)
+
+        if self.writer:
+            self.writer.stop(timeout=remaining(), cancel=cancel)
+            self.writer = None
+        if self.healthy:
+            # release will be handled after running actions, then wait for both
+            try:
+                self.connection.release()
+                self.connection.wait_until_done(remaining())
+            except OSError as e:
+                logger.warning("failed to release {}: {}".format(self.device_id, e))
         self.connection.disconnect()
-        self.server.stop()
+        if self.server:
+            self.server.stop(self.connection.pid)
+
+    def is_stopped(self):
+        """ check if stopped (or not started yet) """
+        return not (self.connection and self.connection.transport)
+
+    def wait_until_done(self, timeout=None):
+        """
+        block until all sent actions finished on device
+
+        :param timeout: max seconds to wait, None means no limit
+        :return: True if finished, False if timeout
+        """
+        # queued payloads have not been sent, connection knows nothing about them
+        if self.writer:
+            start_time = time.monotonic()
+            if not self.writer.wait_until_done(timeout):
+                return False
+            if timeout is not None:
+                timeout = max(timeout - (time.monotonic() - start_time), 0)
+        return self.connection.wait_until_done(timeout)
+
+    def _check_health(self):
+        if not self.healthy:
+            raise RuntimeError(
+                "device {} is unhealthy: {}".format(
+                    self.device_id, self.unhealthy_reason
+                )
+            )
+
+    def publish(self, builder):
+        """
+        apply builder's commands to device.
+        if pipeline enabled, they will be queued and a future will be returned.
+        """
+        self._check_health()
+        if self.writer:
+            return builder.submit(self.writer)
+        builder.publish(self.connection)
+
+    def play(self, gesture):
+        """
+        apply a Gesture to device.
+        if pipeline enabled, it will be queued and a future will be returned.
+        """
+        self._check_health()
+        content = gesture.to_bytes()
+        if self.writer:
+            return self.writer.submit(content, gesture.duration)
+        logger.info("send operation: {!r}".format(content))
+        self.connection.send(content, gesture.duration)
+        self.connection.wait_until_done()
 
     def tap(self, points, pressure=100, duration=None, no_up=None):
         """
@@ -138,27 +273,9 @@ class MNTDevice(object):
         :param pressure: default == 100
         :param duration:
         :param no_up: if true, do not append 'up' at the end
-        :return:
+        :return: future if pipeline enabled, else None
         """
-        points = [list(map(int, each_point)) for each_point in points]
-
-        _builder = CommandBuilder()
-        for point_id, each_point in enumerate(points):
-            x, y = each_point
-            _builder.down(point_id, x, y, pressure)
-        _builder.commit()
-
-        # apply duration
-        if duration:
-            _builder.wait(duration)
-            _builder.commit()
-
-        # need release?
-        if not no_up:
-            for each_id in range(len(points)):
-                _builder.up(each_id)
-
-        _builder.publish(self.connection)
+        return self.play(Gesture.tap(points, pressure, duration, no_up))
 
     def swipe(self, points, pressure=100, duration=None, no_down=None, no_up=None):
         """
@@ -169,35 +286,9 @@ class MNTDevice(object):
         :param duration:
         :param no_down: will not 'down' at the beginning
         :param no_up: will not 'up' at the end
-        :return:
+        :return: future if pipeline enabled, else None
         """
-        points = [list(map(int, each_point)) for each_point in points]
-
-        _builder = CommandBuilder()
-        point_id = 0
-
-        # tap the first point
-        if not no_down:
-            x, y = points.pop(0)
-            _builder.down(point_id, x, y, pressure)
-            _builder.publish(self.connection)
-
-        # start swiping
-        for each_point in points:
-            x, y = each_point
-            _builder.move(point_id, x, y, pressure)
-
-            # add delay between points
-            if duration:
-                _builder.wait(duration)
-            _builder.commit()
-
-        _builder.publish(self.connection)
-
-        # release
-        if not no_up:
-            _builder.up(point_id)
-            _builder.publish(self.connection)
+        return self.play(Gesture.swipe(points, pressure, duration, no_down, no_up))
 
     # extra functions' name starts with 'ext_'
     def ext_smooth_swipe(
@@ -222,32 +313,11 @@ class MNTDevice(object):
         :param part: default to 10
         :param no_down: will not 'down' at the beginning
         :param no_up: will not 'up' at the end
-        :return:
+        :return: future if pipeline enabled, else None
         """
-        if not part:
-            part = 10
-
-        points = [list(map(int, each_point)) for each_point in points]
-
-        for each_index in range(len(points) - 1):
-            cur_point = points[each_index]
-            next_point = points[each_index + 1]
-
-            offset = (
-                int((next_point[0] - cur_point[0]) / part),
-                int((next_point[1] - cur_point[1]) / part),
-            )
-            new_points = [
-                (cur_point[0] + i * offset[0], cur_point[1] + i * offset[1])
-                for i in range(part + 1)
-            ]
-            self.swipe(
-                new_points,
-                pressure=pressure,
-                duration=duration,
-                no_down=no_down,
-                no_up=no_up,
-            )
+        return self.play(
+            Gesture.smooth_swipe(points, pressure, duration, part, no_down, no_up)
+        )
 
 
 @contextmanager
@@ -257,10 +327,60 @@ def safe_device(device_id):
     try:
         yield _device
     finally:
-        time.sleep(config.DEFAULT_DELAY)
         _device.stop()
 
 
+def shutdown_devices(device_list, timeout=None):
+    """
+    stop lots of devices concurrently, with a total deadline
+
+    :param device_list: MNTDevice list
+    :param timeout: total seconds, default to config.SHUTDOWN_TIMEOUT
+    :return: devices which failed, or did not stop before deadline
+    """
+    device_list = list(device_list)
+    if not device_list:
+        return []
+    if timeout is None:
+        timeout = config.SHUTDOWN_TIMEOUT
+
+    def stop(device, future):
+        try:
+            device.stop(timeout)
+        except Exception as e:
+            future.set_exception(e)
+        else:
+            future.set_result(None)
+
+    future_dict = dict()
+    for each_device in device_list:
+        future = Future()
+        future_dict[future] = each_device
+        # daemon threads, the ones beyond deadline will not block exiting
+        thread = threading.Thread(
+            target=stop,
+            args=(each_device, future),
+            name="mnt-stop-{}".format(each_device.device_id),
+        )
+        thread.daemon = True
+        thread.start()
+    done, not_done = wait(future_dict, timeout=timeout)
+
+    failed_list = [future_dict[each] for each in not_done]
+    for each_future in done:
+        error = each_future.exception()
+        if error:
+            logger.warning(
+                "failed to stop {}: {}".format(
+                    future_dict[each_future].device_id, error
+                )
+            )
+            failed_list.append(future_dict[each_future])
+    for each_device in failed_list:
+        logger.warning("device {} did not stop cleanly".format(each_device.device_id))
+    return failed_list
+
+
 if __name__ == "__main__":
     restart_adb()
 
@@ -294,9 +414,9 @@ if __name__ == "__main__":
     device = MNTDevice(_DEVICE_ID)
     device.tap([(400, 500), (500, 500)], duration=1000)
 
-    # you should control time delay by yourself
+    # make sure actions finished before stop
     # otherwise when connection lost, action will never stop.
-    time.sleep(1)
+    device.wait_until_done()
 
     device.stop()
 
@@ -304,4 +424,4 @@ if __name__ == "__main__":
     with safe_device(_DEVICE_ID) as device:
         device.tap([(400, 500), (500, 500)])
         device.swipe([(400, 500), (500, 500)], duration=500)
-        time.sleep(0.5)
+        device.wait_until_done()
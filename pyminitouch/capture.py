@@ -0,0 +1,285 @@
+import subprocess
+
+from pyminitouch.logger import logger
+from pyminitouch import config
+from pyminitouch.actions import CommandBuilder
+from pyminitouch.scheduler import get_scheduler
+
+_ADB = config.ADB_EXECUTOR
+
+# tracking id of a released contact (-1)
+_RELEASED_ID = 0xFFFFFFFF
+
+
+def parse_abs_max(content):
+    """
+    parse max values of abs events, from output of `getevent -lp`
+
+    :return: dict, eg: {'/dev/input/event2': {'ABS_MT_POSITION_X': 1079, ...}}
+    """
+    result = dict()
+    abs_dict = None
+    for each_line in content.splitlines():
+        if each_line.startswith("add device"):
+            abs_dict = result.setdefault(each_line.split(":", 1)[1].strip(), dict())
+            continue
+        if abs_dict is None or " max " not in each_line:
+            continue
+        name, _, info = each_line.rpartition(" : ")
+        name = name.split()[-1]
+        for each_field in info.split(","):
+            key, _, value = each_field.strip().partition(" ")
+            if key == "max":
+                abs_dict[name] = int(value)
+    return result
+
+
+class GeteventParser(object):
+    """
+    convert `getevent -lt` output (multitouch protocol B) to minitouch commands.
+
+    feed it line by line. a CommandBuilder will be returned
+    when a gesture finished (all the contacts released)::
+
+        parser = GeteventParser(connection.max_x, connection.max_y, 1079, 2339)
+        for each_line in open('getevent.txt'):
+            builder = parser.feed(each_line)
+            if builder:
+                builder.publish(connection)
+
+    slots will be used as contact ids.
+    coordinates will be scaled from input device range to minitouch range.
+    """
+
+    def __init__(
+        self,
+        max_x,
+        max_y,
+        input_max_x=None,
+        input_max_y=None,
+        max_pressure=None,
+        input_max_pressure=None,
+        input_device=None,
+        pressure=50,
+    ):
+        # ratio between minitouch and input device
+        self._x_ratio = int(max_x) / int(input_max_x) if input_max_x else 1.0
+        self._y_ratio = int(max_y) / int(input_max_y) if input_max_y else 1.0
+        self._pressure_ratio = (
+            int(max_pressure) / int(input_max_pressure)
+            if max_pressure and input_max_pressure
+            else 1.0
+        )
+        # events from other devices (eg: keys) will be ignored
+        self.input_device = input_device
+        self.pressure = pressure
+
+        self.builder = CommandBuilder()
+        self._slot = 0
+        # slot -> [x, y, pressure], the last values of each slot.
+        # kernel omits values which did not change, even for a new contact.
+        # so they should be kept after release.
+        self._state = dict()
+        # slots of contacts on screen
+        self._active = set()
+        # changes since last report
+        # (slot, is_down) in order, and slots whose values changed
+        self._transition_list = []
+        self._moved = set()
+        # time of the first frame, and total wait (ms) of current gesture
+        # intervals are based on them, so rounding errors will not accumulate
+        self._start_time = None
+        self._elapsed = 0
+
+        self._handler_dict = {
+            "ABS_MT_SLOT": self._on_slot,
+            "ABS_MT_TRACKING_ID": self._on_tracking_id,
+            "ABS_MT_POSITION_X": self._on_x,
+            "ABS_MT_POSITION_Y": self._on_y,
+            "ABS_MT_PRESSURE": self._on_pressure,
+        }
+
+    def feed(self, line):
+        """
+        parse one line, like::
+
+            [   51825.341431] /dev/input/event2: EV_ABS       ABS_MT_SLOT          00000001
+
+        device path may be omitted, if getevent is listening to one device.
+
+        :return: CommandBuilder if a gesture finished, else None
+        """
+        head, _, body = line.partition("] ")
+        if not body:
+            return None
+        field_list = body.split()
+        # device path will be omitted if getevent only listens to one device
+        if len(field_list) == 4:
+            device = field_list.pop(0)
+            if self.input_device and device[:-1] != self.input_device:
+                return None
+        if len(field_list) != 3:
+            return None
+        event_type, code, value = field_list
+
+        if event_type == "EV_ABS":
+            handler = self._handler_dict.get(code)
+            if handler:
+                handler(int(value, 16))
+        elif event_type == "EV_SYN" and code == "SYN_REPORT":
+            return self._on_report(float(head[1:]))
+        return None
+
+    def feed_lines(self, lines):
+        """ parse lines, yield CommandBuilder for each finished gesture """
+        for each_line in lines:
+            builder = self.feed(each_line)
+            if builder:
+                yield builder
+
+    def _on_slot(self, value):
+        self._slot = value
+
+    def _on_tracking_id(self, value):
+        self._transition_list.append((self._slot, value != _RELEASED_ID))
+
+    def _get_state(self):
+        contact = self._state.get(self._slot)
+        if contact is None:
+            contact = self._state[self._slot] = [0, 0, self.pressure]
+        self._moved.add(self._slot)
+        return contact
+
+    def _on_x(self, value):
+        self._get_state()[0] = int(value * self._x_ratio)
+
+    def _on_y(self, value):
+        self._get_state()[1] = int(value * self._y_ratio)
+
+    def _on_pressure(self, value):
+        self._get_state()[2] = int(value * self._pressure_ratio)
+
+    def _split_rounds(self):
+        """
+        split changes of current frame into rounds, one commit per round.
+        a slot can be released and touched again in one frame (or reversed),
+        these two should not be in the same round.
+
+        :return: list of dict, slot -> True (down) / False (up) / None (move)
+        """
+        round_list = [dict()]
+        active = set(self._active)
+        for slot, is_down in self._transition_list:
+            # release of a contact which is not on screen
+            if not is_down and slot not in active:
+                continue
+            if slot in round_list[-1]:
+                round_list.append(dict())
+            # new tracking id without release, release it first
+            if is_down and slot in active and slot not in round_list[-1]:
+                round_list[-1][slot] = False
+                round_list.append(dict())
+            round_list[-1][slot] = is_down
+            if is_down:
+                active.add(slot)
+            else:
+                active.discard(slot)
+
+        # contacts which stay on screen and moved
+        changed = set()
+        for each_round in round_list:
+            changed.update(each_round)
+        for slot in self._moved & self._active - changed:
+            round_list[0][slot] = None
+        return [each for each in round_list if each]
+
+    def _on_report(self, timestamp):
+        round_list = self._split_rounds()
+        self._transition_list = []
+        self._moved.clear()
+        if not round_list:
+            return None
+        builder = self.builder
+
+        # keep the interval between frames
+        if self._start_time is None:
+            self._start_time = timestamp
+        interval = round((timestamp - self._start_time) * 1000) - self._elapsed
+        if interval > 0:
+            builder.wait(interval)
+            self._elapsed += interval
+
+        for each_round in round_list:
+            for slot in sorted(each_round):
+                is_down = each_round[slot]
+                if is_down is False:
+                    builder.up(slot)
+                    self._active.discard(slot)
+                    continue
+                x, y, pressure = self._state.setdefault(slot, [0, 0, self.pressure])
+                if is_down:
+                    builder.down(slot, x, y, pressure)
+                    self._active.add(slot)
+                else:
+                    builder.move(slot, x, y, pressure)
+            builder.commit()
+
+        if self._active:
+            return None
+        # gesture finished
+        self.builder = CommandBuilder()
+        self._start_time = None
+        self._elapsed = 0
+        return builder
+
+
+def capture(device_id, max_x, max_y, max_pressure=None):
+    """
+    capture real touch events from device, and yield them as CommandBuilder.
+    events are streamed from `adb shell getevent -lt`, one gesture per builder::
+
+        for builder in capture(_DEVICE_ID, connection.max_x, connection.max_y):
+            builder.publish(connection)
+
+    :param max_x: max x of minitouch, `MNTConnection.max_x`
+    :param max_y: max y of minitouch, `MNTConnection.max_y`
+    :param max_pressure: max pressure of minitouch, `MNTConnection.max_pressure`
+    """
+    abs_info = (
+        get_scheduler()
+        .check_output(
+            [_ADB, "-s", device_id, "shell", "getevent", "-lp"],
+            key=("getevent", device_id, "-lp"),
+        )
+        .decode(config.DEFAULT_CHARSET)
+    )
+
+    # touch screen is the one supports multitouch
+    input_device, abs_dict = None, dict()
+    for each_device, each_abs_dict in parse_abs_max(abs_info).items():
+        if "ABS_MT_POSITION_X" in each_abs_dict:
+            input_device, abs_dict = each_device, each_abs_dict
+            break
+    assert input_device, "no multitouch device found in {}".format(device_id)
+    logger.info("capture touch events from {}: {}".format(input_device, abs_dict))
+
+    parser = GeteventParser(
+        max_x,
+        max_y,
+        abs_dict["ABS_MT_POSITION_X"],
+        abs_dict.get("ABS_MT_POSITION_Y"),
+        max_pressure,
+        abs_dict.get("ABS_MT_PRESSURE"),
+        input_device=input_device,
+    )
+    process = get_scheduler().popen(
+        [_ADB, "-s", device_id, "shell", "getevent", "-lt", input_device],
+        stdout=subprocess.PIPE,
+        universal_newlines=True,
+        encoding=config.DEFAULT_CHARSET,
+    )
+    try:
+        yield from parser.feed_lines(process.stdout)
+    finally:
+        process.kill()
+        process.wait()
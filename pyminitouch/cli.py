@@ -0,0 +1,266 @@
+"""
+command line driver, run scripted payloads against devices::
+
+    # raw minitouch commands, one payload ends with 'c'
+    pyminitouch -s 123456F -s 654321F actions.txt
+
+    # json lines, one gesture per line
+    echo '{"action": "tap", "points": [[400, 600]], "duration": 100}' | pyminitouch -s 123456F -f json
+
+gesture actions: tap / swipe / ext_smooth_swipe (same args as MNTDevice), and raw::
+
+    {"action": "raw", "content": "d 0 400 400 50\\nc\\nu 0\\nc\\n"}
+
+yaml is also supported (needs PyYAML), each document is a gesture or a list of gestures.
+"""
+import sys
+import json
+import time
+import queue
+import argparse
+import threading
+from concurrent.futures import ThreadPoolExecutor, wait
+
+from pyminitouch.logger import logger
+from pyminitouch import config
+from pyminitouch.actions import MNTDevice, shutdown_devices
+from pyminitouch.scheduler import get_scheduler
+
+_GESTURE_ACTIONS = ("tap", "swipe", "ext_smooth_swipe")
+_FORMAT_DICT = {
+    ".json": "json",
+    ".jsonl": "json",
+    ".yml": "yaml",
+    ".yaml": "yaml",
+}
+
+
+def read_raw(stream):
+    """ yield raw payloads. lines will be grouped until a 'c' """
+    line_list = []
+    for each_line in stream:
+        each_line = each_line.strip()
+        if not each_line:
+            continue
+        line_list.append(each_line)
+        if each_line == "c":
+            yield {"action": "raw", "content": "\n".join(line_list) + "\n"}
+            line_list = []
+    if line_list:
+        yield {"action": "raw", "content": "\n".join(line_list) + "\nc\n"}
+
+
+def read_json(stream):
+    """ yield gestures from json lines """
+    for each_line in stream:
+        each_line = each_line.strip()
+        if each_line:
+            yield json.loads(each_line)
+
+
+def read_yaml(stream):
+    """ yield gestures from yaml documents """
+    import yaml
+
+    for each_doc in yaml.safe_load_all(stream):
+        if isinstance(each_doc, list):
+            yield from each_doc
+        elif each_doc:
+            yield each_doc
+
+
+_READER_DICT = {
+    "raw": read_raw,
+    "json": read_json,
+    "yaml": read_yaml,
+}
+
+
+def read_scripts(path_list, script_format=None):
+    """ yield gestures from files (or stdin, '-') one by one """
+    for each_path in path_list or ["-"]:
+        each_format = script_format
+        if not each_format:
+            suffix = each_path[each_path.rfind(".") :].lower()
+            each_format = _FORMAT_DICT.get(suffix, "raw")
+        reader = _READER_DICT[each_format]
+
+        if each_path == "-":
+            yield from reader(sys.stdin)
+            continue
+        with open(each_path, encoding=config.DEFAULT_CHARSET) as f:
+            yield from reader(f)
+
+
+class DeviceRunner(object):
+    """ run gestures on one device, in order, and record latency """
+
+    # end of gestures
+    _END = object()
+
+    def __init__(self, device):
+        self.device = device
+        self.queue = queue.Queue(maxsize=config.DEFAULT_QUEUE_SIZE)
+        self.latency_list = []
+        self.error_list = []
+        self.start_time = None
+        self.end_time = None
+        self._thread = threading.Thread(
+            target=self._loop, name="mnt-cli-{}".format(device.device_id)
+        )
+        self._thread.daemon = True
+        self._thread.start()
+
+    def put(self, gesture):
+        self.queue.put(gesture)
+
+    def finish(self):
+        """ wait for all gestures finished """
+        self.queue.put(self._END)
+        self._thread.join()
+
+    def _loop(self):
+        last_future = None
+        while True:
+            gesture = self.queue.get()
+            if gesture is self._END:
+                break
+            if self.start_time is None:
+                self.start_time = time.monotonic()
+            try:
+                last_future = self._submit(gesture)
+            except Exception as e:
+                self.error_list.append(e)
+                logger.warning(
+                    "{} failed on {}: {}".format(gesture, self.device.device_id, e)
+                )
+        if last_future:
+            # cancelled or failed ones have been recorded by their callbacks
+            wait([last_future])
+        self.end_time = time.monotonic()
+
+    def _submit(self, gesture):
+        gesture = dict(gesture)
+        action = gesture.pop("action")
+        if action == "raw":
+            future = self.device.writer.submit(gesture["content"])
+        elif action in _GESTURE_ACTIONS:
+            future = getattr(self.device, action)(**gesture)
+        else:
+            raise ValueError("unknown action: {}".format(action))
+
+        def on_done(f):
+            if f.cancelled():
+                self.error_list.append(RuntimeError("cancelled"))
+            elif f.exception():
+                self.error_list.append(f.exception())
+            else:
+                # from sent, waiting in queue is not counted
+                self.latency_list.append(time.monotonic() - f.send_time)
+
+        future.add_done_callback(on_done)
+        return future
+
+    def summary(self):
+        latency_list = sorted(self.latency_list)
+        count = len(latency_list)
+        elapsed = (self.end_time or 0) - (self.start_time or 0)
+
+        def percentile(p):
+            if not latency_list:
+                return 0.0
+            return latency_list[min(int(count * p), count - 1)]
+
+        return {
+            "device": self.device.device_id,
+            "done": count,
+            "error": len(self.error_list),
+            "elapsed": elapsed,
+            "throughput": count / elapsed if elapsed > 0 else 0.0,
+            "p50": percentile(0.5),
+            "p95": percentile(0.95),
+            "max": percentile(1),
+        }
+
+
+def print_summary(summary_list, stream=None):
+    stream = stream or sys.stdout
+    header = "{:<20} {:>8} {:>6} {:>10} {:>10} {:>9} {:>9} {:>9}".format(
+        "device",
+        "done",
+        "error",
+        "elapsed(s)",
+        "gesture/s",
+        "p50(ms)",
+        "p95(ms)",
+        "max(ms)",
+    )
+    print(header, file=stream)
+    for each in summary_list:
+        print(
+            "{:<20} {:>8} {:>6} {:>10.3f} {:>10.2f} {:>9.1f} {:>9.1f} {:>9.1f}".format(
+                each["device"],
+                each["done"],
+                each["error"],
+                each["elapsed"],
+                each["throughput"],
+                each["p50"] * 1000,
+                each["p95"] * 1000,
+                each["max"] * 1000,
+            ),
+            file=stream,
+        )
+
+
+def run(device_id_list, path_list=None, script_format=None):
+    """ run scripts against devices concurrently, and return summaries """
+    # one connection per device, for the whole run
+    with ThreadPoolExecutor(max_workers=len(device_id_list)) as executor:
+        future_list = [
+            executor.submit(MNTDevice, each_id, pipeline=True)
+            for each_id in device_id_list
+        ]
+    device_list = [each.result() for each in future_list if not each.exception()]
+    if len(device_list) != len(future_list):
+        shutdown_devices(device_list)
+        error = next(each.exception() for each in future_list if each.exception())
+        raise RuntimeError("failed to start devices: {}".format(error))
+
+    runner_list = [DeviceRunner(each) for each in device_list]
+    try:
+        for each_gesture in read_scripts(path_list, script_format):
+            for each_runner in runner_list:
+                each_runner.put(each_gesture)
+    finally:
+        for each_runner in runner_list:
+            each_runner.finish()
+        shutdown_devices(device_list)
+    logger.info("adb scheduler: {}".format(get_scheduler().metrics))
+    return [each.summary() for each in runner_list]
+
+
+def main(argv=None):
+    parser = argparse.ArgumentParser(
+        prog="pyminitouch", description="run minitouch scripts on devices"
+    )
+    parser.add_argument(
+        "-s",
+        "--serial",
+        action="append",
+        required=True,
+        help="device id, can be used multiple times",
+    )
+    parser.add_argument(
+        "-f",
+        "--format",
+        choices=sorted(_READER_DICT),
+        help="script format, guessed from file extension by default (raw for stdin)",
+    )
+    parser.add_argument(
+        "scripts", nargs="*", help="script files, read from stdin if empty or '-'"
+    )
+    args = parser.parse_args(argv)
+
+    summary_list = run(args.serial, args.scripts, args.format)
+    print_summary(summary_list)
+    return 1 if any(each["error"] for each in summary_list) else 0
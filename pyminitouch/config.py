@@ -10,6 +10,16 @@ DEFAULT_CHARSET = "utf-8"
 
 # operation
 DEFAULT_DELAY = 0.05
+# max size of payload queue, for pipelined device
+DEFAULT_QUEUE_SIZE = 64
+
+# health monitor
+# seconds between two sweeps
+HEALTH_CHECK_INTERVAL = 5
+
+# teardown
+# seconds, total deadline of shutting down devices
+SHUTDOWN_TIMEOUT = 30
 
 # installer
 MNT_PREBUILT_URL = r"https://github.com/williamfzc/stf-binaries/raw/master/node_modules/minitouch-prebuilt/prebuilt"
@@ -20,3 +30,9 @@ MNT_HOME = "/data/local/tmp/minitouch"
 SYSTEM_NAME = platform.system()
 NEED_SHELL = SYSTEM_NAME != "Windows"
 ADB_EXECUTOR = "adb"
+# seconds, for adb commands which should return quickly
+ADB_TIMEOUT = 10
+# seconds, for pushing files
+ADB_PUSH_TIMEOUT = 60
+# max adb commands running at the same time, in one process
+ADB_MAX_CONCURRENCY = 8
@@ -1,15 +1,15 @@
 import subprocess
-import socket
 import time
-import os
 import random
 from contextlib import contextmanager
 
 from pyminitouch.logger import logger
 from pyminitouch import config
+from pyminitouch.tracker import MNTTracker
+from pyminitouch.transport import TCPTransport
+from pyminitouch.scheduler import get_scheduler, PRIORITY_NORMAL
 from pyminitouch.utils import (
     str2byte,
-    download_file,
     is_port_using,
     is_device_connected,
 )
@@ -17,49 +17,6 @@ from pyminitouch.utils import (
 _ADB = config.ADB_EXECUTOR
 
 
-class MNTInstaller(object):
-    """ install minitouch for android devices """
-
-    def __init__(self, device_id):
-        self.device_id = device_id
-        self.abi = self.get_abi()
-        if self.is_mnt_existed():
-            logger.info("minitouch already existed in {}".format(device_id))
-        else:
-            self.download_target_mnt()
-
-    def get_abi(self):
-        abi = subprocess.getoutput(
-            "{} -s {} shell getprop ro.product.cpu.abi".format(_ADB, self.device_id)
-        )
-        logger.info("device {} is {}".format(self.device_id, abi))
-        return abi
-
-    def download_target_mnt(self):
-        abi = self.get_abi()
-        target_url = "{}/{}/bin/minitouch".format(config.MNT_PREBUILT_URL, abi)
-        logger.info("target minitouch url: " + target_url)
-        mnt_path = download_file(target_url)
-
-        # push and grant
-        subprocess.check_call(
-            [_ADB, "-s", self.device_id, "push", mnt_path, config.MNT_HOME]
-        )
-        subprocess.check_call(
-            [_ADB, "-s", self.device_id, "shell", "chmod", "777", config.MNT_HOME]
-        )
-        logger.info("minitouch already installed in {}".format(config.MNT_HOME))
-
-        # remove temp
-        os.remove(mnt_path)
-
-    def is_mnt_existed(self):
-        file_list = subprocess.check_output(
-            [_ADB, "-s", self.device_id, "shell", "ls", "/data/local/tmp"]
-        )
-        return "minitouch" in file_list.decode(config.DEFAULT_CHARSET)
-
-
 class MNTServer(object):
     """
     manage connection to minitouch.
@@ -80,19 +37,31 @@ class MNTServer(object):
 
     _PORT_SET = config.PORT_SET
 
-    def __init__(self, device_id):
-        assert is_device_connected(device_id)
+    def __init__(self, device_id, forward=True, priority=PRIORITY_NORMAL):
+        """
+        :param device_id:
+        :param forward: forward a port to minitouch. not needed if using unix socket directly
+        :param priority: priority of adb commands, see `pyminitouch.scheduler`
+        """
+        self.priority = priority
+        assert is_device_connected(device_id, priority)
 
         self.device_id = device_id
-        logger.info("searching a usable port ...")
-        self.port = self._get_port()
-        logger.info("device {} bind to port {}".format(device_id, self.port))
+        self.port = None
+        if forward:
+            logger.info("searching a usable port ...")
+            self.port = self._get_port()
+            logger.info("device {} bind to port {}".format(device_id, self.port))
 
         # check minitouch
-        self.installer = MNTInstaller(device_id)
+        # installer (and its downloader) will not be imported until here
+        from pyminitouch.installer import MNTInstaller
+
+        self.installer = MNTInstaller(device_id, self.priority)
 
         # keep minitouch alive
-        self._forward_port()
+        if self.port:
+            self._forward_port()
         self.mnt_process = None
         self._start_mnt()
 
@@ -102,10 +71,24 @@ class MNTServer(object):
             self.heartbeat()
         ), "minitouch did not work. see https://github.com/williamfzc/pyminitouch/issues/11"
 
-    def stop(self):
+    def stop(self, pid=None):
+        """
+        stop minitouch and clean up
+
+        :param pid: minitouch pid on device (`MNTConnection.pid`), will be killed if given
+        """
         self.mnt_process and self.mnt_process.kill()
-        self._PORT_SET.add(self.port)
-        logger.info("device {} unbind to {}".format(self.device_id, self.port))
+        for each_step in (
+            lambda: pid and self._kill_remote_mnt(pid),
+            lambda: self.port and self._remove_forward(),
+        ):
+            try:
+                each_step()
+            except (subprocess.SubprocessError, OSError) as e:
+                logger.warning("failed to clean up {}: {}".format(self.device_id, e))
+        if self.port:
+            self._PORT_SET.add(self.port)
+            logger.info("device {} unbind to {}".format(self.device_id, self.port))
 
     @classmethod
     def _get_port(cls):
@@ -126,9 +109,28 @@ class MNTServer(object):
             "localabstract:minitouch",
         ]
         logger.debug("forward command: {}".format(" ".join(command_list)))
-        output = subprocess.check_output(command_list)
+        output = get_scheduler().check_output(command_list, self.priority)
         logger.debug("output: {}".format(output))
 
+    def _remove_forward(self):
+        """ remove port forward created by _forward_port """
+        command_list = [
+            _ADB,
+            "-s",
+            self.device_id,
+            "forward",
+            "--remove",
+            "tcp:{}".format(self.port),
+        ]
+        logger.debug("remove forward command: {}".format(" ".join(command_list)))
+        get_scheduler().check_call(command_list, self.priority)
+
+    def _kill_remote_mnt(self, pid):
+        """ kill minitouch process on android """
+        command_list = [_ADB, "-s", self.device_id, "shell", "kill", str(pid)]
+        logger.debug("kill minitouch command: {}".format(" ".join(command_list)))
+        get_scheduler().check_call(command_list, self.priority)
+
     def _start_mnt(self):
         """ fork a process to start minitouch on android """
         command_list = [
@@ -139,7 +141,9 @@ class MNTServer(object):
             "/data/local/tmp/minitouch",
         ]
         logger.info("start minitouch: {}".format(" ".join(command_list)))
-        self.mnt_process = subprocess.Popen(command_list, stdout=subprocess.DEVNULL)
+        self.mnt_process = get_scheduler().popen(
+            command_list, self.priority, stdout=subprocess.DEVNULL
+        )
 
     def heartbeat(self):
         """ check if minitouch process alive """
@@ -147,29 +151,43 @@ class MNTServer(object):
 
 
 class MNTConnection(object):
-    """ manage socket connection between pc and android """
+    """
+    manage connection between pc and android
+
+    by default, it connects to a port forwarded by adb.
+    other transports (see `pyminitouch.transport`) can be used instead::
+
+        # unix socket, without adb forward
+        conn = MNTConnection(transport=UnixTransport('@minitouch'))
+
+        # in memory, without device
+        conn = MNTConnection(transport=LoopbackTransport())
+    """
 
     _DEFAULT_HOST = config.DEFAULT_HOST
     _DEFAULT_BUFFER_SIZE = config.DEFAULT_BUFFER_SIZE
 
-    def __init__(self, port):
+    def __init__(self, port=None, transport=None):
         self.port = port
+        if not transport:
+            transport = TCPTransport(port, self._DEFAULT_HOST)
 
         # build connection
-        client = socket.socket(socket.AF_INET, socket.SOCK_STREAM)
-        client.connect((self._DEFAULT_HOST, self.port))
-        self.client = client
+        # time cost of connecting and getting the first line will be used as latency
+        start_time = time.monotonic()
+        transport.connect()
+        self.transport = transport
 
         # get minitouch server info
-        socket_out = client.makefile()
-
         # v <version>
         # protocol version, usually it is 1. needn't use this
-        socket_out.readline()
+        transport.readline()
+        self.latency = time.monotonic() - start_time
+        self.tracker = MNTTracker(self.latency)
 
         # ^ <max-contacts> <max-x> <max-y> <max-pressure>
         _, max_contacts, max_x, max_y, max_pressure, *_ = (
-            socket_out.readline().replace("\n", "").replace("\r", "").split(" ")
+            transport.readline().replace("\n", "").replace("\r", "").split(" ")
         )
         self.max_contacts = max_contacts
         self.max_x = max_x
@@ -177,11 +195,14 @@ class MNTConnection(object):
         self.max_pressure = max_pressure
 
         # $ <pid>
-        _, pid = socket_out.readline().replace("\n", "").replace("\r", "").split(" ")
-        self.pid = pid
+        _, pid = transport.readline().replace("\n", "").replace("\r", "").split(" ")
+        # no process behind it (e.g. loopback), nothing to kill or check
+        self.pid = pid if int(pid) > 0 else None
 
         logger.info(
-            "minitouch running on port: {}, pid: {}".format(self.port, self.pid)
+            "minitouch running on {}, pid: {}, latency: {:.4f}s".format(
+                self.transport, self.pid, self.latency
+            )
         )
         logger.info(
             "max_contact: {}; max_x: {}; max_y: {}; max_pressure: {}".format(
@@ -189,16 +210,62 @@ class MNTConnection(object):
             )
         )
 
+    @property
+    def client(self):
+        """ raw socket, None if transport is not socket based """
+        return getattr(self.transport, "sock", None)
+
     def disconnect(self):
-        self.client and self.client.close()
-        self.client = None
+        self.transport and self.transport.close()
+        self.transport = None
         logger.info("minitouch disconnected")
 
-    def send(self, content):
-        """ send message and get its response """
-        byte_content = str2byte(content)
-        self.client.sendall(byte_content)
-        return self.client.recv(self._DEFAULT_BUFFER_SIZE)
+    def is_alive(self):
+        """ check if connection still alive, without blocking """
+        return bool(self.transport) and self.transport.is_alive()
+
+    def release(self):
+        """ release all contacts, in case some of them are still held """
+        content = "".join(
+            "u {}\n".format(each_id) for each_id in range(int(self.max_contacts))
+        )
+        return self.send(content + "c\n", 0)
+
+    def send(self, content, delay=None):
+        """
+        send message and get its response
+
+        :param content: minitouch commands, str or bytes
+        :param delay: on-device duration (ms), parsed from content if None
+        """
+        if isinstance(content, bytes):
+            byte_content = content
+            # only parsing delay needs str
+            if delay is None:
+                content = content.decode(config.DEFAULT_CHARSET)
+        else:
+            byte_content = str2byte(content)
+        self.transport.sendall(byte_content)
+        self.tracker.track(content, delay)
+        return self.transport.recv(self._DEFAULT_BUFFER_SIZE)
+
+    def wait_until_done(self, timeout=None):
+        """
+        block until all sent commands finished on device
+
+        :param timeout: max seconds to wait, None means no limit
+        :return: True if finished, False if timeout
+        """
+        return self.tracker.wait_until_done(timeout)
+
+
+def __getattr__(name):
+    # MNTInstaller used to live here
+    if name == "MNTInstaller":
+        from pyminitouch.installer import MNTInstaller
+
+        return MNTInstaller
+    raise AttributeError("module {} has no attribute {}".format(__name__, name))
 
 
 @contextmanager
@@ -213,8 +280,14 @@ def safe_connection(device_id):
         yield connection
     finally:
         # disconnect
+        # release will be handled after running actions, then wait for both
+        try:
+            connection.release()
+            connection.wait_until_done()
+        except OSError as e:
+            logger.warning("failed to release {}: {}".format(device_id, e))
         connection.disconnect()
-        server.stop()
+        server.stop(connection.pid)
 
 
 if __name__ == "__main__":
@@ -223,3 +296,4 @@ if __name__ == "__main__":
     with safe_connection(_DEVICE_ID) as conn:
         # conn.send('d 0 150 150 50\nc\nu 0\nc\n')
         conn.send("d 0 500 500 50\nc\nd 1 500 600 50\nw 5000\nc\nu 0\nu 1\nc\n")
+        conn.wait_until_done()
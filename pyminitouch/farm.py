@@ -0,0 +1,245 @@
+import os
+import time
+import queue
+import itertools
+import threading
+import collections
+import multiprocessing
+from concurrent.futures import Future
+
+from pyminitouch.logger import logger
+from pyminitouch import config
+
+# seconds
+_POLL_INTERVAL = 0.05
+_CHECK_INTERVAL = 1
+
+
+def _worker_main(task_queue, result_queue):
+    """ worker process. it owns servers and connections of its devices """
+    # import here, worker should build its own devices
+    from pyminitouch.actions import MNTDevice
+
+    device_dict = dict()
+    # device id -> deque of (task id, content)
+    # payloads waiting for a full writer queue.
+    # a busy device should not block the others in this worker.
+    backlog_dict = collections.defaultdict(collections.deque)
+
+    def reply(task_id, error=None):
+        result_queue.put((task_id, error))
+
+    def on_sent(task_id, future):
+        if future.cancelled():
+            reply(task_id, "cancelled")
+            return
+        error = future.exception()
+        reply(task_id, repr(error) if error else None)
+
+    def send(device_id, task_id, content, block=False):
+        future = device_dict[device_id].writer.submit(content, block=block)
+        future.add_done_callback(lambda f, task_id=task_id: on_sent(task_id, f))
+
+    def drain(block=False):
+        for device_id, backlog in backlog_dict.items():
+            while backlog:
+                task_id, content = backlog[0]
+                try:
+                    send(device_id, task_id, content, block)
+                except queue.Full:
+                    break
+                except Exception as e:
+                    reply(task_id, repr(e))
+                backlog.popleft()
+
+    while True:
+        has_backlog = any(backlog_dict.values())
+        try:
+            task = task_queue.get(timeout=_POLL_INTERVAL if has_backlog else None)
+        except queue.Empty:
+            drain()
+            continue
+        if task is None:
+            break
+        task_id, action, device_id, content = task
+        try:
+            if action == "start":
+                device_dict[device_id] = MNTDevice(device_id, pipeline=True)
+                reply(task_id)
+            elif action == "send":
+                backlog = backlog_dict[device_id]
+                if len(backlog) >= config.DEFAULT_QUEUE_SIZE:
+                    raise RuntimeError("device {} is busy".format(device_id))
+                backlog.append((task_id, content))
+            else:
+                raise ValueError("unknown action: {}".format(action))
+        except Exception as e:
+            reply(task_id, repr(e))
+        drain()
+
+    # everything submitted should be sent before stop
+    # stop() sends queued payloads before disconnecting
+    drain(block=True)
+    for each_device in device_dict.values():
+        each_device.stop()
+
+
+class MNTFarm(object):
+    """
+    drive lots of devices with a process pool.
+
+    devices are sharded across worker processes.
+    each worker starts and owns the servers and connections of its devices,
+    so they will not be limited by GIL and blocking adb calls in one process.
+
+    sample::
+
+        with MNTFarm(["123456F", "654321F"]) as farm:
+            future = farm.submit("123456F", "d 0 400 400 50\nc\nu 0\nc\n")
+            future.result()
+
+    payloads are compiled minitouch commands, eg: `CommandBuilder._content`.
+
+    scheduler (`pyminitouch.scheduler.get_scheduler`) is process-wide,
+    so each worker has its own one. adb commands running at the same time
+    can be up to `processes * config.ADB_MAX_CONCURRENCY`.
+    """
+
+    def __init__(self, device_id_list, processes=None):
+        device_id_list = list(device_id_list)
+        if not processes:
+            processes = os.cpu_count() or 1
+        processes = max(min(processes, len(device_id_list)), 1)
+
+        ctx = multiprocessing.get_context("spawn")
+        self._result_queue = ctx.Queue()
+        self._task_queue_list = [ctx.Queue() for _ in range(processes)]
+        self._worker_list = [
+            ctx.Process(
+                target=_worker_main,
+                args=(each_queue, self._result_queue),
+                name="mnt-farm-{}".format(index),
+            )
+            for index, each_queue in enumerate(self._task_queue_list)
+        ]
+        for each_worker in self._worker_list:
+            each_worker.daemon = True
+            each_worker.start()
+
+        # device id -> worker index
+        self._shard_dict = {
+            each_device: index % processes
+            for index, each_device in enumerate(device_id_list)
+        }
+        # task id -> (future, worker index)
+        self._pending_dict = dict()
+        self._lock = threading.Lock()
+        self._counter = itertools.count()
+        self._stopped = False
+
+        self._collector = threading.Thread(target=self._collect, name="mnt-farm")
+        self._collector.daemon = True
+        self._collector.start()
+
+        # devices start in parallel, in their own workers
+        start_list = [
+            (each_device, self._call("start", each_device))
+            for each_device in device_id_list
+        ]
+        try:
+            for each_device, each_future in start_list:
+                each_future.result()
+                logger.info("device {} started in farm".format(each_device))
+        except Exception:
+            self.stop()
+            raise
+
+    def __enter__(self):
+        return self
+
+    def __exit__(self, *_):
+        self.stop()
+
+    @property
+    def device_id_list(self):
+        return list(self._shard_dict)
+
+    def submit(self, device_id, content):
+        """
+        send payload to device by id
+
+        :param device_id: device which has been started in farm
+        :param content: minitouch commands, str
+        :return: future, resolved when payload finished on device
+        """
+        return self._call("send", device_id, content)
+
+    def stop(self):
+        """ stop all devices and worker processes """
+        if self._stopped:
+            return
+        self._stopped = True
+        for each_queue in self._task_queue_list:
+            each_queue.put(None)
+        for each_worker in self._worker_list:
+            each_worker.join()
+        self._result_queue.put(None)
+        self._collector.join()
+        logger.info("farm stopped")
+
+    def _call(self, action, device_id, content=None):
+        if self._stopped:
+            raise RuntimeError("farm already stopped")
+        worker_index = self._shard_dict[device_id]
+        future = Future()
+        with self._lock:
+            task_id = next(self._counter)
+            self._pending_dict[task_id] = (future, worker_index)
+        self._task_queue_list[worker_index].put((task_id, action, device_id, content))
+        return future
+
+    def _collect(self):
+        """ resolve futures with results from workers """
+        last_check = time.monotonic()
+        while True:
+            # check workers periodically, even if results keep coming
+            if time.monotonic() - last_check >= _CHECK_INTERVAL:
+                self._check_workers()
+                last_check = time.monotonic()
+            try:
+                result = self._result_queue.get(timeout=_CHECK_INTERVAL)
+            except queue.Empty:
+                continue
+            if result is None:
+                break
+            task_id, error = result
+            with self._lock:
+                pending = self._pending_dict.pop(task_id, None)
+            # already failed by _check_workers
+            if pending is None:
+                continue
+            future, _ = pending
+            if error:
+                future.set_exception(RuntimeError(error))
+            else:
+                future.set_result(None)
+        self._check_workers()
+
+    def _check_workers(self):
+        """ tasks of dead workers will never be finished """
+        dead_set = {
+            index
+            for index, each_worker in enumerate(self._worker_list)
+            if not each_worker.is_alive()
+        }
+        if not dead_set:
+            return
+        with self._lock:
+            dead_task_list = [
+                task_id
+                for task_id, (_, worker_index) in self._pending_dict.items()
+                if worker_index in dead_set
+            ]
+            future_list = [self._pending_dict.pop(each)[0] for each in dead_task_list]
+        for each_future in future_list:
+            each_future.set_exception(RuntimeError("worker process exited"))
@@ -0,0 +1,313 @@
+from array import array
+
+from pyminitouch import config
+
+# operation codes, one per minitouch command
+OP_DOWN = 0
+OP_MOVE = 1
+OP_UP = 2
+OP_COMMIT = 3
+OP_WAIT = 4
+
+_OP_CHARS = "dmucw"
+# number of arguments, per operation code
+_OP_ARG_COUNTS = (4, 4, 1, 0, 1)
+
+
+class Gesture(object):
+    """
+    compact gesture, stored in packed arrays (one row per minitouch command).
+
+    build it like CommandBuilder, or with shortcuts::
+
+        gesture = Gesture().down(0, 400, 400, 50).commit().wait(100).up(0).commit()
+        gesture = Gesture.swipe([(100, 100), (500, 500)], duration=100)
+
+        # transforms return new gestures
+        gesture = gesture.translate(100, 0).scale(0.5, 0.5)
+
+        # hashable, can be used as cache key
+        # it can not be appended after hashed, use `copy()` to build a new one
+        cache[gesture] = something
+
+        device.play(gesture)
+
+    columns: ops, contacts, xs, ys, pressures, timings (ms, for 'w' only).
+    unused columns of a row are 0. do not edit them in place.
+    """
+
+    __slots__ = ("ops", "contacts", "xs", "ys", "pressures", "timings", "_hash")
+
+    def __init__(self):
+        self.ops = array("b")
+        self.contacts = array("i")
+        self.xs = array("i")
+        self.ys = array("i")
+        self.pressures = array("i")
+        self.timings = array("i")
+        self._hash = None
+
+    def _append(self, op, contact_id=0, x=0, y=0, pressure=0, ms=0):
+        # hash (maybe a dict key already) should never change
+        if self._hash is not None:
+            raise TypeError("gesture is frozen after hashed, use a copy() instead")
+        self.ops.append(op)
+        self.contacts.append(contact_id)
+        self.xs.append(x)
+        self.ys.append(y)
+        self.pressures.append(pressure)
+        self.timings.append(ms)
+        return self
+
+    def down(self, contact_id, x, y, pressure):
+        """ add minitouch command: 'd <contact_id> <x> <y> <pressure>\n' """
+        return self._append(OP_DOWN, contact_id, int(x), int(y), int(pressure))
+
+    def move(self, contact_id, x, y, pressure):
+        """ add minitouch command: 'm <contact_id> <x> <y> <pressure>\n' """
+        return self._append(OP_MOVE, contact_id, int(x), int(y), int(pressure))
+
+    def up(self, contact_id):
+        """ add minitouch command: 'u <contact_id>\n' """
+        return self._append(OP_UP, contact_id)
+
+    def commit(self):
+        """ add minitouch command: 'c\n' """
+        return self._append(OP_COMMIT)
+
+    def wait(self, ms):
+        """ add minitouch command: 'w <ms>\n' """
+        return self._append(OP_WAIT, ms=int(ms))
+
+    @classmethod
+    def tap(cls, points, pressure=100, duration=None, no_up=None):
+        """ same as MNTDevice.tap """
+        gesture = cls()
+        for point_id, (x, y) in enumerate(points):
+            gesture.down(point_id, x, y, pressure)
+        gesture.commit()
+
+        # apply duration
+        if duration:
+            gesture.wait(duration).commit()
+
+        # need release?
+        if not no_up:
+            for point_id in range(len(points)):
+                gesture.up(point_id)
+            gesture.commit()
+        return gesture
+
+    @classmethod
+    def swipe(cls, points, pressure=100, duration=None, no_down=None, no_up=None):
+        """ same as MNTDevice.swipe """
+        gesture = cls()
+        points = iter(points)
+
+        # tap the first point
+        if not no_down:
+            x, y = next(points)
+            gesture.down(0, x, y, pressure).commit()
+
+        # start swiping
+        for x, y in points:
+            gesture.move(0, x, y, pressure)
+
+            # add delay between points
+            if duration:
+                gesture.wait(duration)
+            gesture.commit()
+
+        # release
+        if not no_up:
+            gesture.up(0).commit()
+        return gesture
+
+    @classmethod
+    def smooth_swipe(
+        cls, points, pressure=100, duration=None, part=None, no_down=None, no_up=None
+    ):
+        """ same as MNTDevice.ext_smooth_swipe """
+        if not part:
+            part = 10
+        gesture = cls()
+        pressure = int(pressure)
+        points = iter(points)
+        first_point = next(points, None)
+        if first_point is None:
+            return gesture
+        cur_x, cur_y = int(first_point[0]), int(first_point[1])
+
+        # each pair of points is a swipe, split into parts
+        for next_x, next_y in points:
+            next_x, next_y = int(next_x), int(next_y)
+            offset_x = int((next_x - cur_x) / part)
+            offset_y = int((next_y - cur_y) / part)
+
+            # the first point is a move too, if not down
+            first = 0
+            if not no_down:
+                gesture._append(OP_DOWN, 0, cur_x, cur_y, pressure)._append(OP_COMMIT)
+                first = 1
+            for i in range(first, part + 1):
+                gesture._append(
+                    OP_MOVE, 0, cur_x + i * offset_x, cur_y + i * offset_y, pressure
+                )
+                if duration:
+                    gesture._append(OP_WAIT, ms=int(duration))
+                gesture._append(OP_COMMIT)
+            if not no_up:
+                gesture._append(OP_UP, 0)._append(OP_COMMIT)
+            cur_x, cur_y = next_x, next_y
+        return gesture
+
+    @classmethod
+    def from_content(cls, content):
+        """ parse minitouch commands, eg: 'd 0 150 150 50\nc\nu 0\nc\n' """
+        gesture = cls()
+        for each_line in content.splitlines():
+            field_list = each_line.split()
+            if not field_list:
+                continue
+            op = _OP_CHARS.find(field_list[0])
+            if op == -1 or len(field_list[0]) != 1:
+                raise ValueError("unknown command: {}".format(each_line))
+            if len(field_list) - 1 != _OP_ARG_COUNTS[op]:
+                raise ValueError("wrong argument number: {}".format(each_line))
+            args = list(map(int, field_list[1:]))
+            if op == OP_WAIT:
+                gesture.wait(*args)
+            elif op == OP_COMMIT:
+                gesture.commit()
+            elif op == OP_UP:
+                gesture.up(*args)
+            else:
+                gesture._append(op, *args)
+        return gesture
+
+    def _derive(self, xs=None, ys=None, pressures=None):
+        """ new gesture sharing nothing with self, with some columns replaced """
+        gesture = Gesture()
+        gesture.ops = array("b", self.ops)
+        gesture.contacts = array("i", self.contacts)
+        gesture.xs = xs if xs is not None else array("i", self.xs)
+        gesture.ys = ys if ys is not None else array("i", self.ys)
+        gesture.pressures = (
+            pressures if pressures is not None else array("i", self.pressures)
+        )
+        gesture.timings = array("i", self.timings)
+        return gesture
+
+    def copy(self):
+        """ return a new (not frozen) gesture """
+        return self._derive()
+
+    def translate(self, dx, dy):
+        """ move all the points, return a new gesture """
+        dx, dy = int(dx), int(dy)
+        return self._derive(
+            xs=array("i", [each + dx for each in self.xs]),
+            ys=array("i", [each + dy for each in self.ys]),
+        )
+
+    def scale(self, sx, sy, sp=None):
+        """ scale points (and pressures, if sp), return a new gesture """
+        return self._derive(
+            xs=array("i", [int(each * sx) for each in self.xs]),
+            ys=array("i", [int(each * sy) for each in self.ys]),
+            pressures=(
+                array("i", [int(each * sp) for each in self.pressures])
+                if sp is not None
+                else None
+            ),
+        )
+
+    @property
+    def duration(self):
+        """ sum of waits (ms) """
+        return sum(self.timings)
+
+    def __len__(self):
+        return len(self.ops)
+
+    def __getitem__(self, index):
+        if isinstance(index, slice):
+            gesture = Gesture()
+            gesture.ops = self.ops[index]
+            gesture.contacts = self.contacts[index]
+            gesture.xs = self.xs[index]
+            gesture.ys = self.ys[index]
+            gesture.pressures = self.pressures[index]
+            gesture.timings = self.timings[index]
+            return gesture
+        return (
+            _OP_CHARS[self.ops[index]],
+            self.contacts[index],
+            self.xs[index],
+            self.ys[index],
+            self.pressures[index],
+            self.timings[index],
+        )
+
+    def _columns(self):
+        return (
+            self.ops,
+            self.contacts,
+            self.xs,
+            self.ys,
+            self.pressures,
+            self.timings,
+        )
+
+    def __eq__(self, other):
+        if not isinstance(other, Gesture):
+            return NotImplemented
+        return self._columns() == other._columns()
+
+    def __hash__(self):
+        if self._hash is None:
+            self._hash = hash(tuple(each.tobytes() for each in self._columns()))
+        return self._hash
+
+    def __repr__(self):
+        return "<Gesture commands={} duration={}ms>".format(len(self), self.duration)
+
+    def to_bytes(self):
+        """ serialize to minitouch commands """
+        ops, contacts, xs, ys = self.ops, self.contacts, self.xs, self.ys
+        pressures, timings = self.pressures, self.timings
+        result = bytearray()
+        for index in range(len(ops)):
+            op = ops[index]
+            if op == OP_COMMIT:
+                result += b"c\n"
+            elif op == OP_WAIT:
+                result += b"w %d\n" % timings[index]
+            elif op == OP_UP:
+                result += b"u %d\n" % contacts[index]
+            else:
+                result += b"%c %d %d %d %d\n" % (
+                    b"dm"[op],
+                    contacts[index],
+                    xs[index],
+                    ys[index],
+                    pressures[index],
+                )
+        return bytes(result)
+
+    def to_content(self):
+        """ serialize to minitouch commands, str """
+        return self.to_bytes().decode(config.DEFAULT_CHARSET)
+
+    def to_numpy(self):
+        """ columns as numpy arrays (zero copy), numpy needed """
+        import numpy
+
+        return {
+            "ops": numpy.frombuffer(self.ops, dtype=numpy.int8),
+            "contacts": numpy.frombuffer(self.contacts, dtype=numpy.intc),
+            "xs": numpy.frombuffer(self.xs, dtype=numpy.intc),
+            "ys": numpy.frombuffer(self.ys, dtype=numpy.intc),
+            "pressures": numpy.frombuffer(self.pressures, dtype=numpy.intc),
+            "timings": numpy.frombuffer(self.timings, dtype=numpy.intc),
+        }
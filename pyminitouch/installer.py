@@ -0,0 +1,69 @@
+import os
+
+from pyminitouch.logger import logger
+from pyminitouch import config
+from pyminitouch.utils import download_file
+from pyminitouch.scheduler import get_scheduler, PRIORITY_BULK, PRIORITY_NORMAL
+
+_ADB = config.ADB_EXECUTOR
+
+
+class MNTInstaller(object):
+    """
+    install minitouch for android devices
+
+    :param priority: scheduler priority of its checks, pushing is always bulk
+    """
+
+    def __init__(self, device_id, priority=PRIORITY_NORMAL):
+        self.device_id = device_id
+        self.priority = priority
+        self.abi = self.get_abi()
+        if self.is_mnt_existed():
+            logger.info("minitouch already existed in {}".format(device_id))
+        else:
+            self.download_target_mnt()
+
+    def get_abi(self):
+        abi = (
+            get_scheduler()
+            .check_output(
+                [_ADB, "-s", self.device_id, "shell", "getprop", "ro.product.cpu.abi"],
+                self.priority,
+                key=("getprop", self.device_id, "ro.product.cpu.abi"),
+            )
+            .decode(config.DEFAULT_CHARSET)
+            .strip()
+        )
+        logger.info("device {} is {}".format(self.device_id, abi))
+        return abi
+
+    def download_target_mnt(self):
+        abi = self.get_abi()
+        target_url = "{}/{}/bin/minitouch".format(config.MNT_PREBUILT_URL, abi)
+        logger.info("target minitouch url: " + target_url)
+        mnt_path = download_file(target_url)
+
+        # push and grant
+        # installing is not urgent, let others go first
+        get_scheduler().check_call(
+            [_ADB, "-s", self.device_id, "push", mnt_path, config.MNT_HOME],
+            PRIORITY_BULK,
+            timeout=config.ADB_PUSH_TIMEOUT,
+        )
+        get_scheduler().check_call(
+            [_ADB, "-s", self.device_id, "shell", "chmod", "777", config.MNT_HOME],
+            PRIORITY_BULK,
+        )
+        logger.info("minitouch already installed in {}".format(config.MNT_HOME))
+
+        # remove temp
+        os.remove(mnt_path)
+
+    def is_mnt_existed(self):
+        file_list = get_scheduler().check_output(
+            [_ADB, "-s", self.device_id, "shell", "ls", "/data/local/tmp"],
+            self.priority,
+            key=("ls", self.device_id, "/data/local/tmp"),
+        )
+        return "minitouch" in file_list.decode(config.DEFAULT_CHARSET)
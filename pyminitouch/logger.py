@@ -1 +1,26 @@
-from loguru import logger
+class _LazyLogger(object):
+    """
+    load logging backend when it is used for the first time.
+
+    loguru is preferred. if it is not installed, use `logging` instead.
+    """
+
+    _backend = None
+
+    def __getattr__(self, name):
+        return getattr(self._load(), name)
+
+    @classmethod
+    def _load(cls):
+        if cls._backend is None:
+            try:
+                from loguru import logger as backend
+            except ImportError:
+                import logging
+
+                backend = logging.getLogger("pyminitouch")
+            cls._backend = backend
+        return cls._backend
+
+
+logger = _LazyLogger()
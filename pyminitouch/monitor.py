@@ -0,0 +1,160 @@
+import subprocess
+import threading
+
+from pyminitouch.logger import logger
+from pyminitouch import config
+from pyminitouch.utils import get_device_state_dict
+from pyminitouch.scheduler import get_scheduler
+
+_ADB = config.ADB_EXECUTOR
+
+
+class MNTHealthMonitor(object):
+    """
+    check all registered devices periodically, in a background thread.
+
+    one sweep checks, for each device:
+
+    - socket connection is still alive
+    - local `adb shell` process is still alive
+    - adb state is 'device' (one `adb devices` for all devices)
+    - minitouch pid (from banner) still exists on device
+
+    devices without adb (loopback) only have the socket check.
+    stopped devices are skipped, until they are started again.
+
+    unhealthy devices will be marked (`device.healthy = False`),
+    so their next actions fail fast rather than timeout::
+
+        monitor = MNTHealthMonitor(on_unhealthy=lambda d: d.reset())
+        monitor.add(device)
+        monitor.start()
+
+        # ...
+
+        monitor.stop()
+    """
+
+    def __init__(self, interval=None, on_unhealthy=None):
+        if interval is None:
+            interval = config.HEALTH_CHECK_INTERVAL
+        self.interval = interval
+        self.on_unhealthy = on_unhealthy
+
+        self._device_dict = dict()
+        self._lock = threading.Lock()
+        self._stop_event = threading.Event()
+        self._thread = None
+
+    def add(self, device):
+        with self._lock:
+            self._device_dict[device.device_id] = device
+
+    def remove(self, device):
+        with self._lock:
+            self._device_dict.pop(device.device_id, None)
+
+    def start(self):
+        self._stop_event.clear()
+        self._thread = threading.Thread(target=self._loop, name="mnt-monitor")
+        self._thread.daemon = True
+        self._thread.start()
+
+    def stop(self):
+        self._stop_event.set()
+        if self._thread:
+            self._thread.join()
+            self._thread = None
+
+    def sweep(self):
+        """
+        check all devices once, and mark them
+
+        :return: dict, device id -> reason (None if healthy)
+        """
+        with self._lock:
+            device_list = [
+                each for each in self._device_dict.values() if not each.is_stopped()
+            ]
+        if not device_list:
+            return dict()
+
+        reason_dict = {each.device_id: None for each in device_list}
+
+        # local checks
+        for each in device_list:
+            if not each.connection.is_alive():
+                reason_dict[each.device_id] = "socket disconnected"
+            elif each.server and not each.server.heartbeat():
+                reason_dict[each.device_id] = "adb shell process exited"
+
+        # adb state
+        adb_device_list = [each for each in device_list if each.server]
+        state_dict = None
+        if adb_device_list:
+            try:
+                state_dict = get_device_state_dict()
+            except (subprocess.SubprocessError, OSError) as e:
+                logger.warning("failed to get device state: {}".format(e))
+        if state_dict is not None:
+            for each in adb_device_list:
+                state = state_dict.get(each.device_id)
+                if not reason_dict[each.device_id] and state != "device":
+                    reason_dict[each.device_id] = "adb state: {}".format(state)
+
+        # remote pid, all devices in parallel
+        pid_check_dict = {
+            each.device_id: self._start_pid_check(each)
+            for each in adb_device_list
+            if each.connection.pid and not reason_dict[each.device_id]
+        }
+        for device_id, future in pid_check_dict.items():
+            try:
+                output = future.result().stdout
+            except subprocess.TimeoutExpired:
+                reason_dict[device_id] = "pid check timeout"
+                continue
+            except (subprocess.SubprocessError, OSError) as e:
+                logger.warning("failed to check pid of {}: {}".format(device_id, e))
+                continue
+            if b"alive" not in output:
+                reason_dict[device_id] = "minitouch process exited"
+
+        for each in device_list:
+            self._mark(each, reason_dict[each.device_id])
+        return reason_dict
+
+    @staticmethod
+    def _start_pid_check(device):
+        command = "[ -d /proc/{} ] && echo alive".format(device.connection.pid)
+        return get_scheduler().submit(
+            subprocess.run,
+            [_ADB, "-s", device.device_id, "shell", command],
+            stdout=subprocess.PIPE,
+            stderr=subprocess.DEVNULL,
+            timeout=config.ADB_TIMEOUT,
+        )
+
+    def _mark(self, device, reason):
+        # stopped while checking, the result means nothing
+        # and it should not be reset by on_unhealthy
+        if device.is_stopped():
+            return
+        if not reason:
+            device.healthy = True
+            device.unhealthy_reason = None
+            return
+        was_healthy = device.healthy
+        device.healthy = False
+        device.unhealthy_reason = reason
+        if was_healthy:
+            logger.warning("device {} unhealthy: {}".format(device.device_id, reason))
+            if self.on_unhealthy:
+                self.on_unhealthy(device)
+
+    def _loop(self):
+        while not self._stop_event.wait(self.interval):
+            try:
+                self.sweep()
+            except Exception as e:
+                logger.warning("health check failed: {}".format(e))
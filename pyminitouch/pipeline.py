@@ -0,0 +1,149 @@
+import time
+import queue
+import threading
+from concurrent.futures import Future, wait
+
+from pyminitouch.logger import logger
+from pyminitouch import config
+
+
+class MNTWriter(object):
+    """
+    send compiled payloads to minitouch from a dedicated thread.
+
+    callers enqueue payloads and get futures back, so they can prepare
+    the next action while the current one is still running on device::
+
+        writer = MNTWriter(connection)
+        future = writer.submit('d 0 400 400 50\nc\nw 1000\nu 0\nc\n', 1000)
+
+        # ... build something else here ...
+
+        future.result()
+        writer.stop()
+
+    payloads are sent one by one, in submitted order.
+    each one occupies the writer until it finished on device.
+    """
+
+    # stop signal for writer thread
+    _STOP = object()
+
+    def __init__(self, connection, maxsize=None):
+        self.connection = connection
+        if maxsize is None:
+            maxsize = config.DEFAULT_QUEUE_SIZE
+        self._queue = queue.Queue(maxsize=maxsize)
+        self._stopped = False
+        # payloads are handled in order, so it finishes the last
+        self._last_future = None
+        self._thread = threading.Thread(
+            target=self._loop, name="mnt-writer-{}".format(connection.transport)
+        )
+        self._thread.daemon = True
+        self._thread.start()
+
+    def submit(self, content, delay=None, block=True):
+        """
+        enqueue a payload, blocked if queue is full
+
+        :param content: minitouch commands, str or bytes
+        :param delay: on-device duration of this payload (ms), parsed from content if None
+        :param block: if false, raise queue.Full rather than blocking
+        :return: future, resolved when payload finished.
+            its `send_time` (`time.monotonic()`) will be set when the payload is sent
+        """
+        if self._stopped:
+            raise RuntimeError("writer already stopped")
+        future = Future()
+        self._queue.put((content, delay, future), block=block)
+        self._last_future = future
+        # stopped while putting, it may be behind the stop signal and never handled.
+        # no effect if writer has taken it already
+        if self._stopped:
+            future.cancel()
+        return future
+
+    def wait_until_done(self, timeout=None):
+        """
+        block until all submitted payloads finished
+
+        :param timeout: max seconds to wait, None means no limit
+        :return: True if finished, False if timeout
+        """
+        future = self._last_future
+        if future is None:
+            return True
+        done, _ = wait([future], timeout=timeout)
+        return bool(done)
+
+    def stop(self, join=True, timeout=None, cancel=False):
+        """
+        stop writer thread after all queued payloads sent
+
+        :param join: wait for writer thread exited
+        :param timeout: max seconds to wait, None means no limit.
+            payloads still queued after it will be cancelled
+        :param cancel: cancel queued payloads rather than sending them
+        """
+        deadline = None if timeout is None else time.monotonic() + timeout
+
+        def remaining():
+            if deadline is None:
+                return None
+            return max(deadline - time.monotonic(), 0)
+
+        if not self._stopped:
+            self._stopped = True
+            if cancel:
+                self._cancel_queued()
+            try:
+                self._queue.put(self._STOP, timeout=remaining())
+            except queue.Full:
+                # no time to send them all
+                self._cancel_queued()
+                self._queue.put(self._STOP)
+        if join:
+            self._thread.join(remaining())
+            if self._thread.is_alive():
+                self._cancel_queued()
+
+    def is_alive(self):
+        return self._thread.is_alive()
+
+    def _loop(self):
+        while True:
+            item = self._queue.get()
+            if item is self._STOP:
+                break
+            content, delay, future = item
+            if not future.set_running_or_notify_cancel():
+                continue
+            future.send_time = time.monotonic()
+            try:
+                logger.info("send operation: {!r}".format(content))
+                self.connection.send(content, delay)
+                self.connection.wait_until_done()
+            except Exception as e:
+                future.set_exception(e)
+            else:
+                future.set_result(None)
+
+        # nobody will handle them
+        self._cancel_queued()
+        logger.info("{} stopped".format(self._thread.name))
+
+    def _cancel_queued(self):
+        stop_found = False
+        while True:
+            try:
+                item = self._queue.get_nowait()
+            except queue.Empty:
+                break
+            if item is self._STOP:
+                stop_found = True
+            else:
+                item[2].cancel()
+        # writer thread still needs it
+        if stop_found:
+            self._queue.put_nowait(self._STOP)
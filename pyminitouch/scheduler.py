@@ -0,0 +1,162 @@
+import queue
+import itertools
+import threading
+import subprocess
+from concurrent.futures import Future
+
+from pyminitouch.logger import logger
+from pyminitouch import config
+
+# smaller runs earlier
+PRIORITY_INTERACTIVE = 0
+PRIORITY_NORMAL = 5
+PRIORITY_BULK = 10
+
+
+class AdbScheduler(object):
+    """
+    run adb commands with bounded concurrency, to avoid adb server saturation.
+
+    - commands with smaller priority run earlier (eg: reconnects before installs)
+    - commands with the same key share one run while in flight (eg: getprop)
+
+    usually you needn't build it by yourself, use `get_scheduler()`::
+
+        output = get_scheduler().check_output(
+            ["adb", "-s", "123456F", "shell", "getprop", "ro.product.model"],
+            key=("getprop", "123456F", "ro.product.model"),
+        )
+    """
+
+    def __init__(self, max_workers=None):
+        if not max_workers:
+            max_workers = config.ADB_MAX_CONCURRENCY
+        self.max_workers = max_workers
+
+        self._queue = queue.PriorityQueue()
+        self._counter = itertools.count()
+        self._lock = threading.Lock()
+        # key -> future, for commands queued or running
+        self._in_flight = dict()
+        self._worker_list = []
+
+        self._submitted = 0
+        self._deduplicated = 0
+        self._completed = 0
+        self._running = 0
+        self._max_queue_depth = 0
+
+    def submit(self, func, *args, priority=PRIORITY_NORMAL, key=None, **kwargs):
+        """
+        schedule a call
+
+        :param priority: smaller runs earlier
+        :param key: calls with the same key will share one run while in flight
+        :return: future
+        """
+        with self._lock:
+            if key is not None and key in self._in_flight:
+                self._deduplicated += 1
+                return self._in_flight[key]
+
+            future = Future()
+            if key is not None:
+                self._in_flight[key] = future
+            self._submitted += 1
+            self._queue.put(
+                (priority, next(self._counter), future, func, args, kwargs, key)
+            )
+            self._max_queue_depth = max(self._max_queue_depth, self._queue.qsize())
+            if len(self._worker_list) < self.max_workers:
+                self._start_worker()
+        return future
+
+    def check_output(
+        self, command_list, priority=PRIORITY_NORMAL, key=None, timeout=None
+    ):
+        """ scheduled `subprocess.check_output` """
+        if timeout is None:
+            timeout = config.ADB_TIMEOUT
+        return self.submit(
+            subprocess.check_output,
+            command_list,
+            priority=priority,
+            key=key,
+            timeout=timeout,
+        ).result()
+
+    def check_call(self, command_list, priority=PRIORITY_NORMAL, timeout=None):
+        """ scheduled `subprocess.check_call`, without output """
+        if timeout is None:
+            timeout = config.ADB_TIMEOUT
+        return self.submit(
+            subprocess.check_call,
+            command_list,
+            priority=priority,
+            stdout=subprocess.DEVNULL,
+            timeout=timeout,
+        ).result()
+
+    def popen(self, command_list, priority=PRIORITY_NORMAL, **kwargs):
+        """ scheduled `subprocess.Popen`. only the spawn is scheduled """
+        return self.submit(
+            subprocess.Popen, command_list, priority=priority, **kwargs
+        ).result()
+
+    @property
+    def metrics(self):
+        with self._lock:
+            return {
+                "queue_depth": self._queue.qsize(),
+                "max_queue_depth": self._max_queue_depth,
+                "running": self._running,
+                "submitted": self._submitted,
+                "completed": self._completed,
+                "deduplicated": self._deduplicated,
+                "workers": len(self._worker_list),
+            }
+
+    def _start_worker(self):
+        worker = threading.Thread(
+            target=self._loop, name="adb-scheduler-{}".format(len(self._worker_list))
+        )
+        worker.daemon = True
+        worker.start()
+        self._worker_list.append(worker)
+
+    def _loop(self):
+        while True:
+            _, _, future, func, args, kwargs, key = self._queue.get()
+            with self._lock:
+                self._running += 1
+            try:
+                if future.set_running_or_notify_cancel():
+                    try:
+                        result = func(*args, **kwargs)
+                    except BaseException as e:
+                        logger.debug("adb call failed: {} {}".format(args, e))
+                        future.set_exception(e)
+                    else:
+                        future.set_result(result)
+            finally:
+                with self._lock:
+                    self._running -= 1
+                    self._completed += 1
+                    if key is not None:
+                        self._in_flight.pop(key, None)
+
+
+_SCHEDULER = None
+_SCHEDULER_LOCK = threading.Lock()
+
+
+def get_scheduler():
+    """
+    process-wide scheduler, for all adb commands.
+    it is not shared across processes, eg: each `MNTFarm` worker has its own one.
+    """
+    global _SCHEDULER
+    with _SCHEDULER_LOCK:
+        if _SCHEDULER is None:
+            _SCHEDULER = AdbScheduler()
+        return _SCHEDULER
@@ -0,0 +1,64 @@
+import time
+
+
+def get_payload_delay(content):
+    """ sum of all 'w <ms>' commands in payload (ms) """
+    delay = 0
+    for each_line in content.splitlines():
+        if each_line.startswith("w "):
+            delay += int(each_line[2:])
+    return delay
+
+
+class MNTTracker(object):
+    """
+    track when sent payloads should be finished on device.
+
+    minitouch returns nothing after actions done,
+    so the finish time is computed from payload's 'w' commands,
+    plus the transport latency of connection.
+
+    minitouch handles payloads one by one,
+    so a new payload will start after the previous one finished.
+    all the deadlines are based on monotonic clock.
+    """
+
+    def __init__(self, latency=0.0):
+        # seconds
+        self.latency = latency
+        self.deadline = time.monotonic()
+
+    def track(self, content, delay=None):
+        """
+        record a sent payload
+
+        :param content: minitouch commands, str
+        :param delay: on-device duration (ms). parsed from content if None
+        :return: deadline of this payload
+        """
+        if delay is None:
+            delay = get_payload_delay(content)
+        start = max(time.monotonic() + self.latency, self.deadline)
+        self.deadline = start + delay / 1000
+        return self.deadline
+
+    def remaining(self):
+        """ seconds before all sent payloads finished """
+        return max(self.deadline - time.monotonic(), 0.0)
+
+    def is_done(self):
+        return self.remaining() == 0.0
+
+    def wait_until_done(self, timeout=None):
+        """
+        block until all sent payloads finished
+
+        :param timeout: max seconds to wait, None means no limit
+        :return: True if finished, False if timeout
+        """
+        remaining = self.remaining()
+        if timeout is not None and remaining > timeout:
+            time.sleep(timeout)
+            return False
+        time.sleep(remaining)
+        return True
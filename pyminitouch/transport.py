@@ -0,0 +1,170 @@
+import socket
+import select
+
+from pyminitouch import config
+
+
+class BaseTransport(object):
+    """
+    byte stream between pc and minitouch, used by MNTConnection.
+
+    subclasses should implement: connect / readline / sendall / recv / close / is_alive
+    """
+
+    def connect(self):
+        raise NotImplementedError
+
+    def readline(self):
+        """ read a line of minitouch banner, str """
+        raise NotImplementedError
+
+    def sendall(self, data):
+        raise NotImplementedError
+
+    def recv(self, size):
+        raise NotImplementedError
+
+    def close(self):
+        raise NotImplementedError
+
+    def is_alive(self):
+        raise NotImplementedError
+
+
+class SocketTransport(BaseTransport):
+    """ stream socket, with any address family """
+
+    family = None
+
+    def __init__(self, address):
+        self.address = address
+        self.sock = None
+        self._reader = None
+
+    def __str__(self):
+        return "{}({})".format(self.__class__.__name__, self.address)
+
+    def connect(self):
+        sock = socket.socket(self.family, socket.SOCK_STREAM)
+        sock.connect(self.address)
+        self.sock = sock
+        self._reader = sock.makefile(encoding=config.DEFAULT_CHARSET)
+
+    def readline(self):
+        return self._reader.readline()
+
+    def sendall(self, data):
+        self.sock.sendall(data)
+
+    def recv(self, size):
+        return self.sock.recv(size)
+
+    def close(self):
+        self._reader and self._reader.close()
+        self.sock and self.sock.close()
+        self._reader = None
+        self.sock = None
+
+    def is_alive(self):
+        """ check if socket still connected, without blocking """
+        if not self.sock:
+            return False
+        try:
+            readable, _, _ = select.select([self.sock], [], [], 0)
+            if not readable:
+                return True
+            # minitouch sends nothing after its banner.
+            # readable with no data means closed by peer.
+            return bool(self.sock.recv(1, socket.MSG_PEEK))
+        except (OSError, ValueError):
+            return False
+
+
+class TCPTransport(SocketTransport):
+    """ tcp socket, usually a port forwarded by adb """
+
+    family = socket.AF_INET
+
+    def __init__(self, port, host=None):
+        super(TCPTransport, self).__init__((host or config.DEFAULT_HOST, port))
+
+
+class UnixTransport(SocketTransport):
+    """
+    unix domain socket, without adb forward.
+    for emulators or containers (eg: redroid) on the same host.
+
+    name starts with '@' means an abstract socket (linux only), eg: '@minitouch'
+    """
+
+    family = getattr(socket, "AF_UNIX", None)
+
+    def __init__(self, path):
+        if path.startswith("@"):
+            path = "\0" + path[1:]
+        super(UnixTransport, self).__init__(path)
+
+    def __str__(self):
+        return "UnixTransport({})".format(self.address.replace("\0", "@", 1))
+
+
+class LoopbackTransport(BaseTransport):
+    """
+    in-memory transport, without any device or I/O.
+    it replies a fake banner (pid 0, no process) and drops everything sent.
+    for testing or benchmarking the protocol layer.
+    """
+
+    def __init__(self, max_contacts=10, max_x=1079, max_y=1919, max_pressure=255):
+        self._banner = [
+            "v 1\n",
+            "^ {} {} {} {}\n".format(max_contacts, max_x, max_y, max_pressure),
+            "$ 0\n",
+        ]
+        self._connected = False
+        # statistics of sent data
+        self.sent_count = 0
+        self.sent_bytes = 0
+
+    def __str__(self):
+        return "LoopbackTransport()"
+
+    def connect(self):
+        self._connected = True
+
+    def readline(self):
+        return self._banner.pop(0) if self._banner else ""
+
+    def sendall(self, data):
+        if not self._connected:
+            raise OSError("loopback transport closed")
+        self.sent_count += 1
+        self.sent_bytes += len(data)
+
+    def recv(self, size):
+        return b""
+
+    def close(self):
+        self._connected = False
+
+    def is_alive(self):
+        return self._connected
+
+
+def build_transport(address):
+    """
+    build transport from address str:
+
+    - 'tcp:<port>' or 'tcp:<host>:<port>'
+    - 'unix:<path>' or 'unix:@<abstract name>'
+    - 'loopback'
+    """
+    scheme, _, rest = address.partition(":")
+    if scheme == "tcp":
+        host, _, port = rest.rpartition(":")
+        return TCPTransport(int(port), host or None)
+    if scheme == "unix":
+        return UnixTransport(rest)
+    if scheme == "loopback":
+        return LoopbackTransport()
+    raise ValueError("unknown transport address: {}".format(address))
@@ -1,10 +1,10 @@
-import requests
 import tempfile
 import socket
 import subprocess
 
 from pyminitouch import config
 from pyminitouch.logger import logger
+from pyminitouch.scheduler import get_scheduler, PRIORITY_INTERACTIVE, PRIORITY_NORMAL
 
 
 def str2byte(content):
@@ -14,6 +14,9 @@ def str2byte(content):
 
 def download_file(target_url):
     """ download file to temp path, and return its file path for further usage """
+    # requests is only needed by installer. import it when used.
+    import requests
+
     resp = requests.get(target_url)
     with tempfile.NamedTemporaryFile("wb+", delete=False) as f:
         file_name = f.name
@@ -37,16 +40,18 @@ def is_port_using(port_num):
 def restart_adb():
     """ restart adb server """
     _ADB = config.ADB_EXECUTOR
-    subprocess.check_call([_ADB, "kill-server"])
-    subprocess.check_call([_ADB, "start-server"])
+    get_scheduler().check_call([_ADB, "kill-server"], PRIORITY_INTERACTIVE)
+    get_scheduler().check_call([_ADB, "start-server"], PRIORITY_INTERACTIVE)
 
 
-def is_device_connected(device_id):
+def is_device_connected(device_id, priority=PRIORITY_NORMAL):
     """ return True if device connected, else return False """
     _ADB = config.ADB_EXECUTOR
     try:
-        device_name = subprocess.check_output(
-            [_ADB, "-s", device_id, "shell", "getprop", "ro.product.model"]
+        device_name = get_scheduler().check_output(
+            [_ADB, "-s", device_id, "shell", "getprop", "ro.product.model"],
+            priority,
+            key=("getprop", device_id, "ro.product.model"),
         )
         device_name = (
             device_name.decode(config.DEFAULT_CHARSET)
@@ -54,6 +59,19 @@ def is_device_connected(device_id):
             .replace("\r", "")
         )
         logger.info("device {} online".format(device_name))
-    except subprocess.CalledProcessError:
+    except subprocess.SubprocessError:
         return False
     return True
+
+
+def get_device_state_dict():
+    """ get states of all devices with one `adb devices`, eg: {'123456F': 'device'} """
+    _ADB = config.ADB_EXECUTOR
+    output = get_scheduler().check_output([_ADB, "devices"], key=("devices",))
+    state_dict = dict()
+    for each_line in output.decode(config.DEFAULT_CHARSET).splitlines()[1:]:
+        if "\t" not in each_line:
+            continue
+        device_id, state = each_line.split("\t", 1)
+        state_dict[device_id] = state.strip()
+    return state_dict
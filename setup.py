@@ -10,4 +10,6 @@ setup(
     url="https://github.com/williamfzc/pyminitouch",
     packages=find_packages(),
     install_requires=["loguru", "requests"],
+    extras_require={"yaml": ["PyYAML"]},
+    entry_points={"console_scripts": ["pyminitouch = pyminitouch.cli:main"]},
 )